@@ -1,12 +1,52 @@
 from tokenizer import Tokenizer
 from collections import defaultdict
-from typing import DefaultDict, List, Dict, Tuple
+from functools import partial
+from typing import (DefaultDict, List, Dict, Tuple, Iterator, BinaryIO, 
+                    Optional)
+from array import array
+from struct import Struct
+from heapq import merge
+from itertools import groupby, islice
+from operator import itemgetter
 import gzip
-from csv import reader, writer, field_size_limit, unix_dialect, QUOTE_NONE
+from io import BufferedReader, TextIOWrapper
+from csv import writer
 from os import path, makedirs
 from contextlib import ExitStack
 from time import time
+from multiprocessing.pool import Pool
 from glob import glob
+from sys import byteorder
+from zlib import crc32
+
+# size in bytes of the read buffers used for the data source and the temporary
+# index blocks, larger than the default to reduce the number of read calls
+READ_BUFFER_SIZE = 128 * 1024
+
+# unsigned 32 bit integer used for lengths and counts in the binary temporary
+# index blocks, in native byte order like the arrays written with 
+# array.tobytes()
+UINT_STRUCT = Struct('=I')
+
+# number of documents sent at a time to each worker process when tokenizing
+# in parallel
+TOKENIZE_CHUNK_SIZE = 256
+
+# number of chunks per worker read from the data source at a time when 
+# tokenizing in parallel, which bounds the documents held in memory
+TOKENIZE_WINDOW_CHUNKS = 4
+
+# tokenizer of a worker process, set when the process is started by the pool
+worker_tokenizer: Optional[Tokenizer] = None
+
+def init_tokenizer_worker(tokenizer: Tokenizer) -> None:
+    global worker_tokenizer
+    worker_tokenizer = tokenizer
+
+# tokenize a (document ID, document body) pair on a worker process
+def tokenize_doc(doc: Tuple[int, str]) -> Tuple[int, object]:
+    doc_id, doc_body = doc
+    return doc_id, worker_tokenizer.tokenize(doc_body)
 
 class Indexer:
     tokenizer: Tokenizer
@@ -14,14 +54,12 @@ class Indexer:
     
     block_posting_count: int
     
-    # the positional inverted index needs a different structure to store
-    # positions
-    inverted_index: DefaultDict[str, List[int]]
-    inverted_index_positional: DefaultDict[str, DefaultDict[str, List[int]]]
-    
-    # contains for each term its document frequency and file number of the
-    # final index blocks
-    master_index: DefaultDict[str, List[int]]
+    # the inverted index stores the document IDs of each term as an array of
+    # unsigned integers. The positional inverted index needs a different 
+    # structure to store positions, holding for each term a list of 
+    # (document ID, positions) pairs
+    inverted_index: DefaultDict[str, array]
+    inverted_index_positional: DefaultDict[str, List[Tuple[int, List[int]]]]
     
     # contains the correspondence of surrogate keys to natural keys (the 
     # hexadecimal keys from the data source)
@@ -37,17 +75,26 @@ class Indexer:
     
     def __init__(self, tokenizer: Tokenizer,
                  max_postings_per_temp_block: int = 1000000) -> None:
-        field_size_limit(10000000)
         self.tokenizer = tokenizer
         self.max_postings_per_temp_block = max_postings_per_temp_block
         self.block_posting_count = 0
         
+        # the methods that depend on the index structure are bound once to
+        # their positional versions, instead of checking for positions on
+        # every token or posting
         if self.tokenizer.use_positions:
-            self.inverted_index_positional = defaultdict(lambda: 
-                                                       defaultdict(lambda: []))
+            self.inverted_index_positional = defaultdict(list)
+            self.index_doc_tokens = self.index_doc_tokens_with_positions
+            self.parse_index_file_row = \
+                self.parse_index_file_row_with_positions
+            self.read_index_block_binary = \
+                self.read_index_block_binary_with_positions
+            self.parse_index_term_for_dumping = \
+                self.parse_index_term_for_dumping_with_positions
+            self.parse_index_term_for_dumping_binary = \
+                self.parse_index_term_for_dumping_binary_with_positions
         else:
-            self.inverted_index = defaultdict(list)
-        self.master_index = defaultdict(lambda: [0, 0])
+            self.inverted_index = defaultdict(partial(array, 'I'))
         self.doc_keys = {}
         
         self.initialize_statistics()
@@ -80,21 +127,34 @@ class Indexer:
 
     # tokenize and index document
     def index_doc(self, doc_id, doc_body) -> None:
-        tokens = self.tokenizer.tokenize(doc_body)
+        self.index_doc_tokens(doc_id, self.tokenizer.tokenize(doc_body))
+    
+    # index the tokens of a document. The tokenizer returns each token only
+    # once per document, so there is a single lookup and posting per term
+    def index_doc_tokens(self, doc_id, tokens) -> None:
+        nr_tokens = len(tokens)
+        self.nr_postings += nr_tokens
+        self.block_posting_count += nr_tokens
         
+        inverted_index = self.inverted_index
+        for token in tokens:
+            inverted_index[token].append(doc_id)
+    
+    # index the tokens of a document with the positions of each token
+    def index_doc_tokens_with_positions(self, doc_id, tokens) -> None:
         nr_tokens = len(tokens)
         self.nr_postings += nr_tokens
         self.block_posting_count += nr_tokens
         
+        inverted_index = self.inverted_index_positional
         for token in tokens:
-            if self.tokenizer.use_positions:
-                self.get_inverted_index()[token][doc_id] = tokens[token]
-            else:
-                self.get_inverted_index()[token].append(doc_id)
+            inverted_index[token].append((doc_id, tokens[token]))
 
     # start indexing a data source, the index files will be placed in the 
-    # index/data_source_filename subfolder
-    def index_data_source(self, data_source_path: str) -> None:
+    # index/data_source_filename subfolder. With more than one worker, 
+    # documents are tokenized in parallel by a pool of worker processes
+    def index_data_source(self, data_source_path: str, 
+                          nr_workers: int = 1) -> None:
         self.initialize_statistics()
         
         start_time = time()
@@ -103,48 +163,57 @@ class Indexer:
         if not path.exists(index_folder):
             makedirs(index_folder)
         
-        # define the dialect used by csv.reader to correctly interpret amazon
-        # review data files
-        dialect = unix_dialect()
-        dialect.delimiter = '\t'
-        dialect.quoting = QUOTE_NONE
-        dialect.escapechar = None
-        
-        with gzip.open(data_source_path, 
-                  mode='rt', encoding='utf8', newline='') as data_file:
-            data_reader = reader(data_file, dialect)
+        with ExitStack() as stack:
+            gzip_file = stack.enter_context(
+                gzip.GzipFile(data_source_path, mode='rb'))
+            data_file = stack.enter_context(TextIOWrapper(
+                BufferedReader(gzip_file, READ_BUFFER_SIZE), 
+                encoding='utf8', newline=''))
             
-            # skip the first line (the header)
-            data_file.readline()
+            # skip the first line (the header) through the same iterator that
+            # reads the documents
+            next(data_file, None)
             
-            for doc in data_reader:
+            # amazon review data files have no quoting nor escaping, so rows
+            # are split directly on tabs. The review body is the last field
+            # read and is followed by the review date, so it never contains
+            # the line terminator
+            docs = (self.parse_doc_from_data_source(line.split('\t', 14)) 
+                    for line in data_file)
+            
+            if nr_workers > 1:
+                pool = stack.enter_context(
+                    Pool(nr_workers, initializer=init_tokenizer_worker, 
+                         initargs=(self.tokenizer,)))
+                tokenized_docs = self.tokenize_docs_in_parallel(
+                    pool, docs, nr_workers)
+            else:
+                tokenized_docs = ((doc_id, self.tokenizer.tokenize(doc_body))
+                                  for doc_id, doc_body in docs)
+            
+            for doc_id, tokens in tokenized_docs:
                 
                 # condition to dump index block to disk
                 if self.block_posting_count > self.max_postings_per_temp_block:
                     
                     self.nr_temp_index_segments += 1
-                    block_file_path = '{}/TempBlock{}.tsv'.format(
-                        index_folder, 
-                        self.nr_temp_index_segments)
-                    self.dump_index_to_disk(block_file_path)
+                    block_file_path = (f'{index_folder}/TempBlock'
+                                       f'{self.nr_temp_index_segments}.bin')
+                    self.dump_index_to_disk_binary(block_file_path)
 
-                doc_id, doc_body = self.parse_doc_from_data_source(doc)
-                self.index_doc(doc_id, doc_body)
+                self.index_doc_tokens(doc_id, tokens)
             
             # if the maximum wasn't exceeded and the index isn't empty, make a
             # final dump to disk
             if len(self.get_inverted_index().keys()) > 0:
                 
                 self.nr_temp_index_segments += 1
-                block_file_path = '{}/TempBlock{}.tsv'.format(
-                    index_folder, 
-                    self.nr_temp_index_segments)
-                self.dump_index_to_disk(block_file_path)
+                block_file_path = (f'{index_folder}/TempBlock'
+                                   f'{self.nr_temp_index_segments}.bin')
+                self.dump_index_to_disk_binary(block_file_path)
             
         self.merge_index_blocks(index_folder)
         
-        self.dump_master_index(index_folder)
-        
         self.dump_doc_keys(index_folder)
         
         end_time = time()
@@ -152,6 +221,7 @@ class Indexer:
         self.indexing_time = end_time - start_time
         
         file_list = glob(index_folder + '/PostingIndexBlock*.tsv')
+        file_list += glob(index_folder + '/PostingIndexBlock*.lookup')
         file_list.append(index_folder + '/MasterIndex.tsv')
         file_list.append(index_folder + '/DocKeys.tsv')
         for file_path in file_list:
@@ -160,138 +230,182 @@ class Indexer:
         
         self.vocabulary_size = len(self.doc_keys)
 
-    # merge temporary index blocks and create the final index blocks
+    # tokenize documents on a pool of worker processes. Documents are read 
+    # and parsed on this process in windows of a fixed size, and at most two
+    # windows are in memory at a time, so memory use doesn't grow with the 
+    # data source. The next window is submitted to the workers before the 
+    # results of the current one are returned, so reading and indexing on this
+    # process overlap with tokenization. Pool.map_async keeps the order of the
+    # documents, so postings remain sorted by document ID
+    def tokenize_docs_in_parallel(
+            self, pool: Pool, docs: Iterator[Tuple[int, str]],
+            nr_workers: int) -> Iterator[Tuple[int, object]]:
+        window_size = nr_workers * TOKENIZE_CHUNK_SIZE * TOKENIZE_WINDOW_CHUNKS
+        pending_window = None
+        
+        while True:
+            window = list(islice(docs, window_size))
+            next_window = None
+            if window:
+                next_window = pool.map_async(tokenize_doc, window, 
+                                             TOKENIZE_CHUNK_SIZE)
+            
+            if pending_window is not None:
+                yield from pending_window.get()
+            
+            if next_window is None:
+                return
+            pending_window = next_window
+
+    # merge temporary index blocks and create the final index blocks and the
+    # master index.
+    # Temporary blocks are written with their terms sorted, so each block is
+    # read as a sorted stream of rows and the streams are combined with a k-way
+    # merge, which yields the rows of all blocks in global term order.
+    # The resulting master index TSV file on disk will have a term on the first
+    # column of each row, followed on each column by its document frequency and
+    # the block number of the final index where it can be found. Its rows are
+    # written as each term is merged, already in sorted order
     def merge_index_blocks(self, index_blocks_folder: str) -> None:
         file_path_list = []
-        last_term_list = []
-        
-        # temporary dictionary of terms that were read from each temporary
-        # index block. The key is the block number while the value is its index
-        # as a dictionary
-        temp_merge_dict = defaultdict(dict)
         
         # prepare list of block file paths
         for block_number in range(1, self.nr_temp_index_segments + 1):
             
             file_path_list.append(
-                '{}/TempBlock{}.tsv'.format(index_blocks_folder, block_number))
+                f'{index_blocks_folder}/TempBlock{block_number}.bin')
             
         with ExitStack() as stack:
             
-            block_files = [stack.enter_context(open(file_path)) 
+            master_index_file = stack.enter_context(
+                open(f'{index_blocks_folder}/MasterIndex.tsv', mode='wt', 
+                     encoding='utf8', newline=''))
+            block_files = [stack.enter_context(
+                               open(file_path, mode='rb', 
+                                    buffering=READ_BUFFER_SIZE)) 
                            for file_path in file_path_list]
-            file_readers = [reader(block_file, delimiter='\t') 
-                            for block_file in block_files]
+            block_rows = [self.read_index_block_binary(block_file) 
+                          for block_file in block_files]
             
-            # the maximum number of postings read per block is 70% of the total
-            # divided by the number of temporary index blocks
-            max_postings_read_per_block = int((self.max_postings_per_temp_block 
-                                        / self.nr_temp_index_segments) * 0.7)
+            # rows with equal terms are yielded in block order, so postings
+            # remain sorted by document ID after being concatenated
+            merged_rows = merge(*block_rows, key=itemgetter(0))
             
             nr_final_index_blocks = 1
             self.block_posting_count = 0
-            nr_merged_postings = 0
             
-            while(nr_merged_postings < self.nr_postings):
-                
-                last_term_list.clear()
+            # dumping an index block clears the inverted index in place, so
+            # the reference remains valid for the whole merge
+            inverted_index = self.get_inverted_index()
+            
+            for term, term_rows in groupby(merged_rows, key=itemgetter(0)):
                 
-                # read terms from each temporary index block until the maximum
-                # number of postings is exceeded
-                for block_nr in range(0, self.nr_temp_index_segments):
+                doc_freq = 0
+                for _, value in term_rows:
                     
-                    nr_postings_read = 0
-                    while nr_postings_read < max_postings_read_per_block:
-                        try:
-                            row = next(file_readers[block_nr])
-                        except StopIteration:
-                            break
-                        term, value = self.parse_index_file_row(row)
-                        temp_merge_dict[block_nr + 1][term] = value
-                        nr_postings_read += len(value)
+                    nr_postings_for_term = len(value)
+                    self.block_posting_count += nr_postings_for_term
+                    inverted_index[term] += value
                     
-                    last_term_list.append(term)
+                    doc_freq += nr_postings_for_term
                 
-                # of the last terms read on each block, the lexicographically
-                # lowest term will be the last to be merged, while the others
-                # remain in memory for the next iteration
-                last_term_list.sort()
-                last_term_to_merge = last_term_list[0]
-                
-                # merge on memory all terms in the temporary dictionary of read 
-                # terms from each block that are ready to be merged
-                for block_nr in range(1, self.nr_temp_index_segments + 1):
-                    
-                    block_terms = list(temp_merge_dict[block_nr].keys())
-                    
-                    for term in block_terms:
-                        
-                        if term <= last_term_to_merge:
-                            
-                            nr_postings_for_term = len(temp_merge_dict[block_nr][term])
-                            self.block_posting_count += nr_postings_for_term
-                            if self.tokenizer.use_positions:
-                                
-                                posting_dict = temp_merge_dict[block_nr].pop(term)
-                                for posting in posting_dict:
-                                    self.get_inverted_index()[term][posting] = posting_dict[posting]
-                            
-                            else:
-                                
-                                self.get_inverted_index()[term] += temp_merge_dict[block_nr].pop(term)
-                            
-                            nr_merged_postings += nr_postings_for_term
-                            self.master_index[term][0] += nr_postings_for_term
-                            self.master_index[term][1] = nr_final_index_blocks
+                master_index_file.write(
+                    f'{term}\t{doc_freq}\t{nr_final_index_blocks}\n')
                 
                 # dump to disk if the number of postings on the final index on
                 # memory exceeds the maximum per block
                 if self.block_posting_count >= self.max_postings_per_temp_block:
-                    block_file_path = '{}/PostingIndexBlock{}.tsv'.format(
-                        index_blocks_folder, 
-                        nr_final_index_blocks)
+                    block_file_path = (f'{index_blocks_folder}/'
+                                       'PostingIndexBlock'
+                                       f'{nr_final_index_blocks}.tsv')
                     self.dump_index_to_disk(block_file_path)
                     nr_final_index_blocks += 1
             
             # if the maximum wasn't exceeded and the index isn't empty, make a
             # final dump to disk
-            if len(self.get_inverted_index().keys()) > 0:
-                block_file_path = '{}/PostingIndexBlock{}.tsv'.format(
-                    index_blocks_folder, 
-                    nr_final_index_blocks)
+            if len(inverted_index) > 0:
+                block_file_path = (f'{index_blocks_folder}/PostingIndexBlock'
+                                   f'{nr_final_index_blocks}.tsv')
                 self.dump_index_to_disk(block_file_path)
 
     # add index file to memory
     def read_index_from_disk(self, index_file_path: str):
         with open(index_file_path, 
                   mode='rt', encoding='utf8', newline='') as data_file:
-            data_reader = reader(data_file, delimiter='\t')
-
-            for row in data_reader:
+            inverted_index = self.get_inverted_index()
+            for line in data_file:
+                row = line.rstrip('\r\n').split('\t')
                 term, value = self.parse_index_file_row(row)
-                self.get_inverted_index()[term] = value
+                inverted_index[term] = value
 
     # process the contents of an index file for indexing in memory again
     def parse_index_file_row(self, row: List[str]):
         term = row[0]
-        posting_str_list = row[1:]
-        if self.tokenizer.use_positions:
-            value = defaultdict(lambda: [])
-            for posting_str in posting_str_list:
-                doc_id, positions_str = posting_str.split(':')
-                positions_list = list(map(int, 
-                                          positions_str.split(',')))
-                value[doc_id] = positions_list
-        else:
-            value = list(map(int, posting_str_list))
+        value = array('I', map(int, row[1:]))
         return term, value
+    
+    # process the contents of a positional index file for indexing in memory
+    # again
+    def parse_index_file_row_with_positions(self, row: List[str]):
+        term = row[0]
+        value = []
+        for posting_str in row[1:]:
+            doc_id, positions_str = posting_str.split(':')
+            positions_list = list(map(int, positions_str.split(',')))
+            value.append((int(doc_id), positions_list))
+        return term, value
+
+    # read the terms of a binary index block in the order they were written,
+    # yielding each term with its postings
+    def read_index_block_binary(
+            self, block_file: BinaryIO) -> Iterator[Tuple[str, array]]:
+        while True:
+            header = block_file.read(UINT_STRUCT.size)
+            if not header:
+                return
+            
+            term_length, = UINT_STRUCT.unpack(header)
+            term = block_file.read(term_length).decode('utf8')
+            nr_postings, = UINT_STRUCT.unpack(block_file.read(UINT_STRUCT.size))
+            
+            yield term, self.read_uint_array(block_file, nr_postings)
+    
+    # read the terms of a positional binary index block in the order they were
+    # written, yielding each term with its postings
+    def read_index_block_binary_with_positions(
+            self, block_file: BinaryIO) -> Iterator[Tuple[str, list]]:
+        while True:
+            header = block_file.read(UINT_STRUCT.size)
+            if not header:
+                return
+            
+            term_length, = UINT_STRUCT.unpack(header)
+            term = block_file.read(term_length).decode('utf8')
+            nr_postings, = UINT_STRUCT.unpack(block_file.read(UINT_STRUCT.size))
+            doc_ids = self.read_uint_array(block_file, nr_postings)
+            positions_counts = self.read_uint_array(block_file, nr_postings)
+            positions = self.read_uint_array(block_file, sum(positions_counts))
+            
+            value = []
+            start = 0
+            for doc_id, count in zip(doc_ids, positions_counts):
+                value.append((doc_id, positions[start:start + count].tolist()))
+                start += count
+            
+            yield term, value
+    
+    # read an array of unsigned integers from a binary index block
+    def read_uint_array(self, block_file: BinaryIO, count: int) -> array:
+        values = array('I')
+        values.frombytes(block_file.read(count * values.itemsize))
+        return values
 
     # process the contents of an Amazon review data file for indexing. 
     # Fields other than reviewid are concatenated separated by spaces, as the
     # body of the document
     def parse_doc_from_data_source(self, doc: List[str]) -> Tuple[str, str]:
         doc_id = doc[2]
-        doc_body = '{} {} {}'.format(doc[5], doc[12], doc[13])
+        doc_body = f'{doc[5]} {doc[12]} {doc[13]}'
         
         self.nr_indexed_docs += 1
         self.doc_keys[self.nr_indexed_docs] = doc_id
@@ -299,57 +413,114 @@ class Indexer:
         return self.nr_indexed_docs, doc_body
 
     # process the contents of a term from the index on memory for storing on
-    # disk
-    def parse_index_term_for_dumping(self, term: str) -> List[str]:
-        row = [term]
+    # disk as an encoded TSV row
+    def parse_index_term_for_dumping(self, term: str) -> bytes:
+        postings_str = '\t'.join(map(str, self.inverted_index[term]))
         
-        for posting in self.get_inverted_index()[term]:
-            if self.tokenizer.use_positions:
-                positions_str = ','.join([str(i) for i in 
-                                  self.get_inverted_index()[term][posting]])
-                row.append(str(posting) + ':' + positions_str)
-            else:
-                row.append(str(posting))
+        return f'{term}\t{postings_str}\n'.encode('utf8')
+    
+    # process the contents of a term from the positional index on memory for
+    # storing on disk as an encoded TSV row
+    def parse_index_term_for_dumping_with_positions(self, term: str) -> bytes:
+        postings_str = '\t'.join(
+            [f"{doc_id}:{','.join(map(str, positions))}" 
+             for doc_id, positions in self.inverted_index_positional[term]])
         
-        return row
+        return f'{term}\t{postings_str}\n'.encode('utf8')
 
     # the resulting TSV file on disk will have a term on the first column of
     # each row, and a posting on each subsequent column, as its document ID.
     # When positions are being considered for the index, each posting will be a
     # string containing the document ID followed by the character ':' and the
-    # list of positions on the document separated by ','
+    # list of positions on the document separated by ','.
+    # A lookup table for the file is also written next to it, with the same
+    # name and the .lookup extension. It contains for each term the CRC32 hash
+    # of the term, the byte offset of its row in the TSV file and the length of
+    # the row, as unsigned 64 bit little-endian integers, sorted by hash, so
+    # rows can be found with a binary search without reading the whole file.
+    # 64 bit integers allow for index files larger than 4 GiB
     def dump_index_to_disk(self, file_path: str) -> None:
-        with open(file_path, mode='wt', encoding='utf8', 
-                  newline='') as block_file:
-            block_writer = writer(block_file, delimiter='\t')
+        lookup_entries = []
+        row_offset = 0
+        
+        with open(file_path, mode='wb') as block_file:
             
-            ordered_terms = list(self.get_inverted_index().keys())
-            list.sort(ordered_terms)
+            ordered_terms = sorted(self.get_inverted_index())
             for block_term in ordered_terms:
-                block_writer.writerow(
-                    self.parse_index_term_for_dumping(block_term))
+                row_bytes = self.parse_index_term_for_dumping(block_term)
+                block_file.write(row_bytes)
+                
+                lookup_entries.append((crc32(block_term.encode('utf8')), 
+                                       row_offset, len(row_bytes)))
+                row_offset += len(row_bytes)
+        
+        lookup_entries.sort()
+        lookup_table = array('Q')
+        for lookup_entry in lookup_entries:
+            lookup_table.extend(lookup_entry)
+        if byteorder == 'big':
+            lookup_table.byteswap()
+        
+        with open(path.splitext(file_path)[0] + '.lookup', 
+                  mode='wb') as lookup_file:
+            lookup_table.tofile(lookup_file)
         
         self.block_posting_count = 0
         
         self.get_inverted_index().clear()
     
-    # the resulting TSV file on disk will have a term on the first column of
-    # each row, followed on each column by its document frequency and the block 
-    # number of the final index where it can be found
-    def dump_master_index(self, index_folder_path):
-        file_path = index_folder_path + '/MasterIndex.tsv'
+    # process the contents of a term from the index on memory for storing on
+    # disk as a binary record
+    def parse_index_term_for_dumping_binary(self, term: str) -> bytearray:
+        postings = self.inverted_index[term]
+        term_bytes = term.encode('utf8')
         
-        with open(file_path, mode='wt', encoding='utf8', 
-                  newline='') as master_index_file:
-            file_writer = writer(master_index_file, delimiter='\t')
-            keys = list(self.master_index.keys())
-            list.sort(keys)
-            keys.sort()
-            for key in keys:
-                file_writer.writerow([key, 
-                                      self.master_index[key][0],
-                                      self.master_index[key][1]])
+        record = bytearray(UINT_STRUCT.pack(len(term_bytes)))
+        record += term_bytes
+        record += UINT_STRUCT.pack(len(postings))
+        record += postings.tobytes()
+        
+        return record
+    
+    # process the contents of a term from the positional index on memory for
+    # storing on disk as a binary record
+    def parse_index_term_for_dumping_binary_with_positions(
+            self, term: str) -> bytearray:
+        postings = self.inverted_index_positional[term]
+        term_bytes = term.encode('utf8')
+        
+        record = bytearray(UINT_STRUCT.pack(len(term_bytes)))
+        record += term_bytes
+        record += UINT_STRUCT.pack(len(postings))
+        record += array('I', [doc_id for doc_id, _ in postings]).tobytes()
+        record += array('I', [len(positions) 
+                              for _, positions in postings]).tobytes()
+        for _, positions in postings:
+            record += array('I', positions).tobytes()
+        
+        return record
 
+    # the resulting binary file on disk is used for temporary index blocks,
+    # which are written and read only once, and avoids converting document IDs
+    # and positions to and from text. It will have a record for each term with
+    # the length of the term in bytes, the term and its number of postings,
+    # followed by the array of document IDs. When positions are being
+    # considered for the index, the record is followed by the array with the
+    # number of positions of each posting and then the array of all positions.
+    # All integers are unsigned 32 bit in native byte order, so the blocks are
+    # only meant to be read on the machine that wrote them
+    def dump_index_to_disk_binary(self, file_path: str) -> None:
+        with open(file_path, mode='wb') as block_file:
+            
+            ordered_terms = sorted(self.get_inverted_index())
+            for block_term in ordered_terms:
+                block_file.write(
+                    self.parse_index_term_for_dumping_binary(block_term))
+        
+        self.block_posting_count = 0
+        
+        self.get_inverted_index().clear()
+    
     # the resulting TSV file on disk will have the surrogate key on each row,
     # followed by the natural key (hexadecimal) on the next column
     def dump_doc_keys(self, index_folder_path: str) -> None:
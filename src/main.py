@@ -24,6 +24,7 @@ class Main:
         self.stemmer_enabled = True
         self.use_positions = False
         self.max_post = 1000000
+        self.workers = 1
         self.parser = ArgumentParser()
         self.tokenizer = Tokenizer(stopwords_path = self.stopwords_path, 
                                 stemmer_enabled = self.stemmer_enabled, 
@@ -57,6 +58,9 @@ class Main:
         # maximum postings per block for the SPIMI
         parser.add_argument("--max_post", help="Set the maximum postings per block",
                             type=int)
+        # number of processes used to tokenize documents
+        parser.add_argument("--workers", help="Set the number of worker processes for tokenization",
+                            type=int, metavar="(integer number)")
         return parser
 
     def check_arguments(self, parser, args):
@@ -99,6 +103,9 @@ class Main:
         if args.max_post:
             self.max_post = args.max_post     
 
+        if args.workers:
+            self.workers = args.workers
+
     def main(self):
 
         # create and check all arguments
@@ -106,7 +113,8 @@ class Main:
         args = parser.parse_args()
         self.check_arguments(parser, args)
 
-        self.indexer.index_data_source(data_source_path = self.data_path)
+        self.indexer.index_data_source(data_source_path = self.data_path,
+                                       nr_workers = self.workers)
 
         statistics = self.indexer.get_statistics()
 
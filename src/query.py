@@ -2,12 +2,22 @@ from tokenizer import Tokenizer
 import csv
 from os import path
 from collections import defaultdict
+from typing import Dict, List, Tuple, Sequence
+from mmap import mmap, ACCESS_READ
+from bisect import bisect_left
+from zlib import crc32
+from sys import byteorder
+from array import array
 
 class Query:
     dock_keys = {}
     doc_keys_folder_path: str
     master_index_folder_path: str
     master_index: dict
+    index_folder_path: str
+    # memory maps of the final posting index blocks and their lookup tables,
+    # by block number
+    posting_blocks: Dict[str, Tuple[mmap, Sequence[int]]]
     tokenize: Tokenizer      
     word_compressed: str  
 
@@ -25,6 +35,10 @@ class Query:
                                          + '/MasterIndex.tsv')
 
         self.master_index = defaultdict(lambda: defaultdict(dict))
+        
+        self.index_folder_path = ('index/' 
+                                  + path.basename(data_path).split('.')[0])
+        self.posting_blocks = {}
 
         self.tokenize = Tokenizer(stopwords_path = '', stemmer_enabled = True, 
                                   size_filter = 0)
@@ -60,4 +74,57 @@ class Query:
             print("Inserted term: " + term)
             print("Normalized term: " + word)
             print("Document frequency: " + str("Not found" if self.master_index[word]['doc_freq']=={} else self.master_index[word]['doc_freq']))
-            print("Main index block number for term: "+ str("Not found" if self.master_index[word]['file_path']=={} else self.master_index[word]['file_path']))
\ No newline at end of file
+            print("Main index block number for term: "+ str("Not found" if self.master_index[word]['file_path']=={} else self.master_index[word]['file_path']))
+
+    # memory map a posting index block and its lookup table, keeping them open
+    # for later lookups. The lookup table is viewed as a flat sequence of
+    # (term hash, row offset, row length) unsigned 64 bit integers, which are
+    # stored little-endian, so on big-endian machines it is copied and swapped
+    def open_posting_block(
+            self, block_number: str) -> Tuple[mmap, Sequence[int]]:
+        if block_number not in self.posting_blocks:
+            block_file_path = (f'{self.index_folder_path}/PostingIndexBlock'
+                               f'{block_number}')
+            
+            with open(block_file_path + '.tsv', 'rb') as block_file:
+                block_map = mmap(block_file.fileno(), 0, access=ACCESS_READ)
+            with open(block_file_path + '.lookup', 'rb') as lookup_file:
+                lookup_map = mmap(lookup_file.fileno(), 0, access=ACCESS_READ)
+            
+            if byteorder == 'little':
+                lookup_table = memoryview(lookup_map).cast('Q')
+            else:
+                lookup_table = array('Q')
+                lookup_table.frombytes(lookup_map)
+                lookup_table.byteswap()
+            self.posting_blocks[block_number] = (block_map, lookup_table)
+        
+        return self.posting_blocks[block_number]
+
+    # returns the document IDs of the postings of a normalized term, reading
+    # only its row from the posting index block where it is stored. It isn't
+    # used by process_query yet, which only reports the master index, and is
+    # meant for later lookups of postings
+    def candidates(self, term: str) -> List[int]:
+        block_number = self.master_index[term]['file_path']
+        if block_number == {}:
+            return []
+        
+        block_map, lookup_table = self.open_posting_block(block_number)
+        term_hashes = lookup_table[0::3]
+        term_bytes = term.encode('utf8')
+        term_hash = crc32(term_bytes)
+        
+        # different terms may share a hash, so every entry with the same hash
+        # is checked against the term on its row
+        entry = bisect_left(term_hashes, term_hash)
+        while entry < len(term_hashes) and term_hashes[entry] == term_hash:
+            row_offset = lookup_table[3 * entry + 1]
+            row_length = lookup_table[3 * entry + 2]
+            row = block_map[row_offset:row_offset + row_length].rstrip(
+                b'\n').split(b'\t')
+            if row[0] == term_bytes:
+                return [int(posting.split(b':')[0]) for posting in row[1:]]
+            entry += 1
+        
+        return []
@@ -1,4 +1,4 @@
-from re import sub
+import re
 from Stemmer import Stemmer
 from collections import defaultdict
 from typing import List, Dict, Set
@@ -10,6 +10,12 @@ class Tokenizer:
     stemmer: Stemmer
     use_positions: bool
     
+    # translation table that lowercases ASCII letters and replaces every other
+    # byte that isn't a digit by a space
+    symbols_table: bytes
+    # matches words that mix letters with numbers
+    mixed_word_pattern: re.Pattern
+    
     # An empty string as a stopwords_path disables stopwords.
     # A size_filter of 0 disables size filter
     def __init__(self, stopwords_path: str = 'content/stopwords.txt', 
@@ -30,6 +36,27 @@ class Tokenizer:
         
         self.use_positions = use_positions
         
+        alphanumeric = bytes(range(ord('0'), ord('9') + 1)) + bytes(
+            range(ord('a'), ord('z') + 1))
+        self.symbols_table = bytes(
+            byte if byte in alphanumeric 
+            else byte + 32 if ord('A') <= byte <= ord('Z') 
+            else ord(' ') 
+            for byte in range(256))
+        self.mixed_word_pattern = re.compile('[0-9]+[a-z]+|[a-z]+[0-9]+')
+        
+    # The stemmer can't be pickled, so it is left out when the tokenizer is
+    # sent to worker processes and created again when it is unpickled
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state.pop('stemmer', None)
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        if self.stemmer_enabled:
+            self.stemmer = Stemmer('english')
+    
     def tokenize(self, input_string: str):
         word_list = self.preprocess_input(input_string)
         
@@ -40,48 +67,58 @@ class Tokenizer:
         
         return tokens
     
-    # The input string has all HTML line breaks and symbols replaced by spaces,
-    # and words that start or end with numbers are then removed. It is then
-    # made all lower case and split into substrings using the spaces to get the 
-    # words
+    # The input string has all HTML line breaks replaced by spaces, and is then
+    # made all lower case with symbols replaced by spaces in a single
+    # translation pass (non ASCII characters are treated as symbols). It is
+    # then split on whitespace to get the words, and words that start or end 
+    # with numbers are removed
     def preprocess_input(self, input_string: str) -> List[str]:
-        word_list = sub("<br />|[^0-9a-zA-Z]+", " ", input_string)
-        word_list = sub("[^a-zA-Z ]+[a-zA-Z]+|[a-zA-Z]+[^a-zA-Z ]+", "", word_list).lower().split(" ")
+        input_bytes = input_string.replace('<br />', ' ').encode(
+            'ascii', 'replace').translate(self.symbols_table)
+        word_list = input_bytes.decode('ascii').split()
+        
+        # matching the pattern over the whole string dominates tokenization
+        # time, so it is skipped for inputs without digits (checked by 
+        # deleting them), and otherwise only applied to words that mix letters
+        # with digits
+        if len(input_bytes.translate(None, b'0123456789')) < len(input_bytes):
+            word_list = [word for word in 
+                         (word if word.isalpha() or word.isdigit() 
+                          else self.mixed_word_pattern.sub('', word) 
+                          for word in word_list) 
+                         if word]
         
         return word_list
     
-    # Returns a set of tokens.
-    # It makes a single iteration over all words to apply the stopword filter, 
-    # the size filter and the stemmer, to avoid multiple passes
-    def stem_and_filter_words(self, word_list: List[str]) -> Set[str]:
-        tokens = set()
-
-        for i in range(0, len(word_list)):
-            if word_list[i] not in self.stopwords:
-                if len(word_list[i]) > self.size_filter:
-                    if self.stemmer_enabled:
-                        token = self.stemmer.stemWord(word_list[i])
-                    else:
-                        token = word_list[i]
-                    tokens.add(token)
+    # Returns a list of unique tokens, in order of first occurrence.
+    # The stopword and size filters are applied in a single pass, and the 
+    # remaining words are then stemmed with one batch call to the stemmer
+    def stem_and_filter_words(self, word_list: List[str]) -> List[str]:
+        kept_words = [word for word in word_list 
+                      if word not in self.stopwords 
+                      and len(word) > self.size_filter]
         
-        return tokens
+        if self.stemmer_enabled:
+            kept_words = self.stemmer.stemWords(kept_words)
+        
+        return list(dict.fromkeys(kept_words))
     
     # Returns a dictionary of tokens associated with lists of respective 
     # positions in the document.
-    # It makes a single iteration over all words to apply the stopword filter, 
-    # the size filter and the stemmer, to avoid multiple passes
+    # The stopword and size filters are applied in a single pass, and the 
+    # remaining words are then stemmed with one batch call to the stemmer
     def stem_and_filter_words_with_positions(self, 
                                  word_list: List[str]) -> Dict[str, List[int]]:
-        tokens = defaultdict(lambda: [])
-
-        for i in range(0, len(word_list)):
-            if word_list[i] not in self.stopwords:
-                if len(word_list[i]) > self.size_filter:
-                    if self.stemmer_enabled:
-                        token = self.stemmer.stemWord(word_list[i])
-                    else:
-                        token = word_list[i]
-                    tokens[token].append(i)
+        kept_positions = [i for i, word in enumerate(word_list) 
+                          if word not in self.stopwords 
+                          and len(word) > self.size_filter]
+        kept_words = [word_list[i] for i in kept_positions]
+        
+        if self.stemmer_enabled:
+            kept_words = self.stemmer.stemWords(kept_words)
+        
+        tokens = defaultdict(list)
+        for i, token in zip(kept_positions, kept_words):
+            tokens[token].append(i)
         
         return tokens